@@ -0,0 +1,106 @@
+"""
+Background archival of decided artist applications.
+
+Approved and rejected applications whose decision (updated_at) is older than
+ARCHIVE_AFTER_DAYS are moved from artist_applications to
+artist_applications_archive in batches of ARCHIVE_BATCH_SIZE, pausing
+ARCHIVE_BATCH_PAUSE_SECONDS between batches so the job does not compete with
+live traffic. A pass runs every ARCHIVE_INTERVAL_SECONDS.
+
+Each batch is copied with upserts and only then deleted from the hot
+collection, so an interrupted run is simply picked up by the next one and
+several workers running the job at once only repeat work.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+from pymongo import ReplaceOne
+
+from db import artist_applications_collection, artist_applications_archive_collection
+
+load_dotenv()
+
+# Configuration
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "1.0"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+
+DECIDED_STATUSES = ["approved", "rejected"]
+
+_stop_event: Optional[asyncio.Event] = None
+_archiver_task: Optional[asyncio.Task] = None
+
+def archive_batch(cutoff: datetime) -> int:
+    """Move one batch of decided applications older than cutoff; returns how many were moved"""
+    batch = list(
+        artist_applications_collection.find({
+            "status": {"$in": DECIDED_STATUSES},
+            "updated_at": {"$lt": cutoff}
+        })
+        # Oldest decisions first; the (status, updated_at) index serves this
+        # order (merging the two status ranges) instead of sorting the backlog
+        .sort("updated_at", 1)
+        .limit(ARCHIVE_BATCH_SIZE)
+    )
+    if not batch:
+        return 0
+
+    artist_applications_archive_collection.bulk_write(
+        [ReplaceOne({"_id": application["_id"]}, application, upsert=True) for application in batch],
+        ordered=False
+    )
+    artist_applications_collection.delete_many({
+        "_id": {"$in": [application["_id"] for application in batch]},
+        "status": {"$in": DECIDED_STATUSES}
+    })
+    return len(batch)
+
+async def _sleep_unless_stopped(seconds: float) -> bool:
+    """Sleep for the given time; returns True if the archiver was stopped meanwhile"""
+    try:
+        await asyncio.wait_for(_stop_event.wait(), seconds)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+async def _run_archiver():
+    while True:
+        cutoff = datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+        try:
+            while True:
+                moved = await asyncio.to_thread(archive_batch, cutoff)
+                if moved:
+                    print(f"📦 Archived {moved} decided applications")
+                if moved < ARCHIVE_BATCH_SIZE:
+                    break
+                if await _sleep_unless_stopped(ARCHIVE_BATCH_PAUSE_SECONDS):
+                    return
+        except Exception as e:
+            print(f"❌ Application archival failed, will retry next pass: {e}")
+
+        if await _sleep_unless_stopped(ARCHIVE_INTERVAL_SECONDS):
+            return
+
+async def start_archiver():
+    """Start the background archival job (called from the app lifespan)"""
+    global _stop_event, _archiver_task
+    if not ARCHIVE_ENABLED:
+        return
+    _stop_event = asyncio.Event()
+    _archiver_task = asyncio.create_task(_run_archiver())
+
+async def stop_archiver():
+    """Stop the archival job after its current batch"""
+    global _stop_event, _archiver_task
+    if _archiver_task is None:
+        return
+    _stop_event.set()
+    await _archiver_task
+    _stop_event = None
+    _archiver_task = None
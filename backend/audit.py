@@ -0,0 +1,127 @@
+"""
+Write-behind audit log for admin review actions.
+
+Route handlers call record_audit_event(), which only enqueues the event. A
+background task started from the app lifespan drains the bounded queue and
+writes events with insert_many, flushing whenever AUDIT_BATCH_SIZE events are
+waiting or AUDIT_FLUSH_INTERVAL_SECONDS has passed since the first one.
+stop_audit_writer() flushes whatever is left before shutdown.
+
+Audit events are a compliance record and must not be dropped: if the queue is
+full, or the writer is not running (e.g. in scripts), the event is inserted
+synchronously instead.
+"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from db import audit_log_collection
+
+load_dotenv()
+
+# Configuration
+AUDIT_QUEUE_MAXSIZE = int(os.getenv("AUDIT_QUEUE_MAXSIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+
+_queue: Optional[asyncio.Queue] = None
+_writer_task: Optional[asyncio.Task] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def record_audit_event(
+    action: str,
+    actor_id,
+    target_id,
+    before: Optional[dict],
+    after: Optional[dict]
+):
+    """Queue an audit event for the background writer"""
+    event = {
+        "action": action,
+        "actor_id": actor_id,
+        "target_id": target_id,
+        "before": before,
+        "after": after,
+        "created_at": datetime.utcnow()
+    }
+
+    if _queue is not None and _running_in_writer_loop():
+        try:
+            _queue.put_nowait(event)
+            return
+        except asyncio.QueueFull:
+            pass
+
+    audit_log_collection.insert_one(event)
+
+def _running_in_writer_loop() -> bool:
+    try:
+        return asyncio.get_running_loop() is _loop
+    except RuntimeError:
+        return False
+
+async def _flush(batch: List[dict]):
+    if batch:
+        await asyncio.to_thread(audit_log_collection.insert_many, batch, ordered=False)
+
+async def _run_writer(queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+    while True:
+        event = await queue.get()
+        if event is None:
+            return
+
+        batch = [event]
+        deadline = loop.time() + AUDIT_FLUSH_INTERVAL_SECONDS
+        stop = False
+        while len(batch) < AUDIT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is None:
+                stop = True
+                break
+            batch.append(event)
+
+        try:
+            await _flush(batch)
+        except Exception as e:
+            # Keep the writer alive; fall back to one-by-one inserts
+            print(f"❌ Audit batch insert failed, retrying individually: {e}")
+            for item in batch:
+                try:
+                    await asyncio.to_thread(audit_log_collection.insert_one, item)
+                except Exception as item_error:
+                    print(f"❌ Could not write audit event {item['action']}: {item_error}")
+
+        if stop:
+            return
+
+async def start_audit_writer():
+    """Start the background writer (called from the app lifespan)"""
+    global _queue, _writer_task, _loop
+    _loop = asyncio.get_running_loop()
+    _queue = asyncio.Queue(maxsize=AUDIT_QUEUE_MAXSIZE)
+    _writer_task = asyncio.create_task(_run_writer(_queue, _loop))
+
+async def stop_audit_writer():
+    """Flush queued events and stop the background writer"""
+    global _queue, _writer_task, _loop
+    if _writer_task is None:
+        return
+
+    # Events recorded from here on are written synchronously; the sentinel
+    # goes behind every queued event so they are all flushed first
+    queue, writer_task = _queue, _writer_task
+    _queue = None
+    _writer_task = None
+    _loop = None
+    await queue.put(None)
+    await writer_task
@@ -1,15 +1,17 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from bson import ObjectId
 import os
+import uuid
 from dotenv import load_dotenv
 
 from db import users_collection
 from models import TokenData
+from revocation import is_token_revoked
 
 load_dotenv()
 
@@ -18,8 +20,40 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-super-secret-jwt-key")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "30"))
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (defaults match passlib's)
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # bcrypt or argon2
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+PASSWORD_HASH_SCHEMES = ["bcrypt", "argon2"]
+
+def build_password_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_memory_cost: int = ARGON2_MEMORY_COST,
+    argon2_parallelism: int = ARGON2_PARALLELISM
+) -> CryptContext:
+    """Build a password context hashing with `scheme`.
+
+    Hashes from the other supported scheme, or with different cost
+    parameters, still verify but are reported as needing an update.
+    argon2 requires the optional argon2-cffi package.
+    """
+    if scheme not in PASSWORD_HASH_SCHEMES:
+        raise ValueError(f"Unsupported password hash scheme: {scheme}")
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_HASH_SCHEMES if other != scheme],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__rounds=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism
+    )
+
+pwd_context = build_password_context()
 
 # JWT Bearer
 security = HTTPBearer()
@@ -28,6 +62,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one uses outdated parameters"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
@@ -40,12 +78,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; iat_ms lets per-user revocation cut off
+    # older tokens (iat is whole seconds, too coarse to order a login right after one)
+    issued_at = datetime.utcnow()
+    iat_ms = int(issued_at.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    to_encode.update({"exp": expire, "iat": issued_at, "iat_ms": iat_ms, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token and return token data"""
+def decode_access_token(token: str) -> TokenData:
+    """Decode a raw JWT string and return token data"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -53,19 +95,36 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("user_id")
         role: int = payload.get("role")
         
         if user_id is None or role is None:
             raise credentials_exception
             
-        token_data = TokenData(user_id=user_id, role=role)
+        token_data = TokenData(
+            user_id=user_id,
+            role=role,
+            jti=payload.get("jti"),
+            iat=payload.get("iat"),
+            iat_ms=payload.get("iat_ms"),
+            exp=payload.get("exp")
+        )
     except JWTError:
         raise credentials_exception
     
+    # In-memory denylist check, no database access
+    # Tokens from before iat_ms existed only have whole-second precision
+    issued_at = token_data.iat_ms / 1000 if token_data.iat_ms is not None else token_data.iat
+    if is_token_revoked(token_data.jti, token_data.user_id, issued_at):
+        raise credentials_exception
+    
     return token_data
 
+def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Verify JWT token and return token data"""
+    return decode_access_token(credentials.credentials)
+
 def get_current_user(token_data: TokenData = Depends(verify_token)):
     """Get current user from token"""
     user = users_collection.find_one({"_id": ObjectId(token_data.user_id)})
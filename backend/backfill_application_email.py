@@ -0,0 +1,57 @@
+"""
+One-off migration: copy each applicant's email onto their artist applications.
+
+New applications get `email` when they are submitted; this fills it in for
+applications created before that, in both the live and archive collections.
+The join runs server-side and writes back with $merge, and only touches
+applications that have no email yet, so the script is safe to re-run.
+
+Usage:
+    python backfill_application_email.py
+"""
+
+from db import artist_applications_collection, artist_applications_archive_collection
+
+def backfill_collection(collection) -> int:
+    """Fill in missing emails for one collection; returns how many were missing"""
+    missing = collection.count_documents({"email": {"$exists": False}})
+    if not missing:
+        return 0
+
+    collection.aggregate([
+        {"$match": {"email": {"$exists": False}}},
+        {
+            "$lookup": {
+                "from": "users",
+                "localField": "user_id",
+                "foreignField": "_id",
+                "as": "user"
+            }
+        },
+        {"$unwind": "$user"},
+        {"$project": {"_id": 1, "email": "$user.email"}},
+        {
+            "$merge": {
+                "into": collection.name,
+                "on": "_id",
+                "whenMatched": "merge",
+                "whenNotMatched": "discard"
+            }
+        }
+    ])
+    return missing
+
+def backfill_application_email():
+    for collection in (artist_applications_collection, artist_applications_archive_collection):
+        print(f"📝 Backfilling applicant email in {collection.name}...")
+        missing = backfill_collection(collection)
+        remaining = collection.count_documents({"email": {"$exists": False}})
+        print(f"✅ Filled {missing - remaining} of {missing} applications missing an email")
+        if remaining:
+            print(f"⚠️  {remaining} applications belong to users that no longer exist")
+
+if __name__ == "__main__":
+    try:
+        backfill_application_email()
+    except Exception as e:
+        print(f"❌ Error backfilling application email: {e}")
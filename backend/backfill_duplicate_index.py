@@ -0,0 +1,77 @@
+"""
+One-off migration: add duplicate detection data to existing applications.
+
+Applications get their MinHash signature, LSH band keys and normalized
+portfolio links when they are submitted. This fills them in for older live
+and archived applications, then links possible duplicates across the whole
+history, so it has to run after `ensure_indexes()` has created the indexes
+(i.e. after the server has started once). Safe to re-run; pass --recompute
+to rebuild the fields of every application, e.g. after a change to how
+portfolio links are normalized.
+
+Usage:
+    python backfill_duplicate_index.py [--recompute]
+"""
+
+import argparse
+
+from pymongo import UpdateOne
+
+from db import artist_applications_collection, artist_applications_archive_collection
+from duplicates import dedup_fields, find_possible_duplicates
+
+BATCH_SIZE = 500
+
+COLLECTIONS = (artist_applications_collection, artist_applications_archive_collection)
+
+def _flush(collection, updates: list):
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+        updates.clear()
+
+def backfill_dedup_fields(recompute: bool = False) -> int:
+    """Compute signatures, band keys and portfolio keys where missing (or everywhere)"""
+    updated = 0
+    query = {} if recompute else {"dedup_signature": {"$exists": False}}
+    for collection in COLLECTIONS:
+        updates = []
+        cursor = collection.find(
+            query,
+            {"stage_name": 1, "portfolio_links": 1}
+        )
+        for application in cursor:
+            fields = dedup_fields(application.get("stage_name", ""), application.get("portfolio_links", []))
+            updates.append(UpdateOne({"_id": application["_id"]}, {"$set": fields}))
+            updated += 1
+            if len(updates) >= BATCH_SIZE:
+                _flush(collection, updates)
+        _flush(collection, updates)
+    return updated
+
+def backfill_possible_duplicates() -> int:
+    """Recompute possible_duplicates for every application; returns how many have any"""
+    flagged = 0
+    for collection in COLLECTIONS:
+        updates = []
+        cursor = collection.find({}, {"user_id": 1, "dedup_signature": 1, "dedup_bands": 1, "portfolio_keys": 1})
+        for application in cursor:
+            duplicates = find_possible_duplicates(application, application["user_id"], exclude_id=application["_id"])
+            updates.append(UpdateOne({"_id": application["_id"]}, {"$set": {"possible_duplicates": duplicates}}))
+            if duplicates:
+                flagged += 1
+            if len(updates) >= BATCH_SIZE:
+                _flush(collection, updates)
+        _flush(collection, updates)
+    return flagged
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill duplicate detection data")
+    parser.add_argument("--recompute", action="store_true", help="rebuild the fields of every application")
+    args = parser.parse_args()
+    try:
+        print("🔎 Computing duplicate detection fields...")
+        print(f"✅ Updated {backfill_dedup_fields(args.recompute)} applications")
+        print("🔗 Linking possible duplicates...")
+        print(f"✅ {backfill_possible_duplicates()} applications have possible duplicates")
+    except Exception as e:
+        print(f"❌ Error backfilling duplicate index: {e}")
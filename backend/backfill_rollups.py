@@ -0,0 +1,81 @@
+"""
+Rebuild activity rollups from existing users and applications.
+
+Registrations are bucketed by users.created_at, submissions by the
+applications' created_at and approvals/rejections by their updated_at, across
+both the live and archive collections. Grouping runs server-side and the
+results replace the matching bucket documents via $merge, so the script is
+safe to re-run. Increments made by the live server while it runs can be
+overwritten; run it before deploying the rollup hooks or at a quiet time.
+
+Usage:
+    python backfill_rollups.py
+"""
+
+from db import (
+    users_collection,
+    artist_applications_collection,
+    artist_applications_archive_collection,
+    activity_rollups_collection,
+)
+from rollups import STORED_GRANULARITIES
+
+# metric -> (collection, extra $match, date field)
+SOURCES = {
+    "registrations": (users_collection, {}, "created_at"),
+    "applications.submitted": (artist_applications_collection, {}, "created_at"),
+    "applications.approved": (artist_applications_collection, {"status": "approved"}, "updated_at"),
+    "applications.rejected": (artist_applications_collection, {"status": "rejected"}, "updated_at"),
+}
+
+def backfill_metric(metric: str, granularity: str):
+    collection, match, date_field = SOURCES[metric]
+    pipeline = []
+    if collection is artist_applications_collection:
+        pipeline.append({"$unionWith": {"coll": artist_applications_archive_collection.name}})
+    pipeline += [
+        {"$match": {**match, date_field: {"$type": "date"}}},
+        {
+            "$group": {
+                "_id": {"$dateTrunc": {"date": f"${date_field}", "unit": granularity}},
+                "count": {"$sum": 1}
+            }
+        },
+        {
+            # Same _id format as rollups.bucket_id()
+            "$project": {
+                "_id": {
+                    "$concat": [
+                        f"{granularity}:{metric}:",
+                        {"$dateToString": {"date": "$_id", "format": "%Y-%m-%dT%H:%M:%S"}}
+                    ]
+                },
+                "granularity": granularity,
+                "metric": metric,
+                "bucket": "$_id",
+                "count": 1
+            }
+        },
+        {
+            "$merge": {
+                "into": activity_rollups_collection.name,
+                "on": "_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }
+        }
+    ]
+    collection.aggregate(pipeline)
+
+def backfill_rollups():
+    for metric in SOURCES:
+        for granularity in STORED_GRANULARITIES:
+            print(f"📊 Rebuilding {granularity} buckets for {metric}...")
+            backfill_metric(metric, granularity)
+    print(f"✅ {activity_rollups_collection.count_documents({})} rollup buckets")
+
+if __name__ == "__main__":
+    try:
+        backfill_rollups()
+    except Exception as e:
+        print(f"❌ Error backfilling rollups: {e}")
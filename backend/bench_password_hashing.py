@@ -0,0 +1,103 @@
+"""
+Benchmark password hashing settings on the current machine.
+
+For each candidate setting this reports hashes per second and the p50/p99
+latency of verifying a password, which is the CPU cost that dominates
+POST /auth/login (the user lookup is not included). Use it to pick
+PASSWORD_HASH_SCHEME and its cost parameters for the deployment hardware.
+
+Usage:
+    python bench_password_hashing.py
+    python bench_password_hashing.py --candidates bcrypt:12 argon2:2:65536:4 --samples 50 --login-samples 500
+
+Candidates are `bcrypt:<rounds>` or `argon2:<time_cost>:<memory_cost_kib>:<parallelism>`.
+argon2 candidates need the optional argon2-cffi package and are skipped without it.
+Hash throughput uses --samples hashes; login latency uses --login-samples
+verifies. With fewer than 100 of those a p99 would just be the maximum, so
+the maximum is reported instead.
+"""
+
+import argparse
+import statistics
+import time
+
+from passlib.exc import MissingBackendError
+
+from auth import build_password_context
+
+DEFAULT_CANDIDATES = [
+    "bcrypt:10",
+    "bcrypt:11",
+    "bcrypt:12",
+    "bcrypt:13",
+    "argon2:2:65536:4",
+    "argon2:3:65536:4",
+    "argon2:2:102400:8",
+]
+
+BENCH_PASSWORD = "CorrectHorseBattery9"
+
+def parse_candidate(candidate: str) -> dict:
+    """Turn a candidate string into build_password_context() arguments"""
+    scheme, *params = candidate.split(":")
+    if scheme == "bcrypt" and len(params) == 1:
+        return {"scheme": "bcrypt", "bcrypt_rounds": int(params[0])}
+    if scheme == "argon2" and len(params) == 3:
+        return {
+            "scheme": "argon2",
+            "argon2_time_cost": int(params[0]),
+            "argon2_memory_cost": int(params[1]),
+            "argon2_parallelism": int(params[2]),
+        }
+    raise ValueError(f"Invalid candidate: {candidate}")
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+MIN_P99_SAMPLES = 100
+
+def bench_candidate(candidate: str, samples: int, login_samples: int) -> dict:
+    context = build_password_context(**parse_candidate(candidate))
+
+    started = time.perf_counter()
+    password_hash = None
+    for _ in range(samples):
+        password_hash = context.hash(BENCH_PASSWORD)
+    hash_seconds = time.perf_counter() - started
+
+    latencies = []
+    for _ in range(login_samples):
+        started = time.perf_counter()
+        context.verify(BENCH_PASSWORD, password_hash)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "candidate": candidate,
+        "hashes_per_second": samples / hash_seconds,
+        "login_p50_ms": statistics.median(latencies),
+        "login_tail_ms": percentile(latencies, 0.99) if login_samples >= MIN_P99_SAMPLES else max(latencies),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password hashing settings")
+    parser.add_argument("--candidates", nargs="+", default=DEFAULT_CANDIDATES)
+    parser.add_argument("--samples", type=int, default=20, help="hashes per candidate")
+    parser.add_argument("--login-samples", type=int, default=200, help="verifies per candidate")
+    args = parser.parse_args()
+
+    tail_label = "login p99" if args.login_samples >= MIN_P99_SAMPLES else "login max"
+    print(f"{'candidate':<22} {'hashes/s':>10} {'login p50':>11} {tail_label:>11}")
+    for candidate in args.candidates:
+        try:
+            result = bench_candidate(candidate, args.samples, args.login_samples)
+        except MissingBackendError:
+            print(f"{candidate:<22} skipped (argon2-cffi not installed)")
+            continue
+        print(
+            f"{result['candidate']:<22} {result['hashes_per_second']:>10.1f} "
+            f"{result['login_p50_ms']:>8.1f} ms {result['login_tail_ms']:>8.1f} ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark "similar artists" queries against a synthetic catalogue.
+
+Builds a GenreSimilarityIndex of --artists artists with 1-3 genres each from a
+vocabulary of --genres genres, then times --queries random top-k lookups and
+reports p50/p99 latency against the 5 ms budget. No database is needed.
+
+Usage:
+    python bench_recommendations.py --artists 100000 --queries 2000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+
+from recommendations import GenreSimilarityIndex
+
+LATENCY_BUDGET_MS = 5.0
+
+def build_index(artist_count: int, genre_count: int, seed: int) -> GenreSimilarityIndex:
+    rng = random.Random(seed)
+    # Skewed genre popularity, like a real catalogue
+    genres = [f"genre-{i}" for i in range(genre_count)]
+    weights = [1.0 / (rank + 1) for rank in range(genre_count)]
+
+    index = GenreSimilarityIndex()
+    for i in range(artist_count):
+        artist_genres = set(rng.choices(genres, weights=weights, k=rng.randint(1, 3)))
+        index.add_artist(f"artist-{i}", f"Artist {i}", artist_genres)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark similar-artist queries")
+    parser.add_argument("--artists", type=int, default=100_000)
+    parser.add_argument("--genres", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = build_index(args.artists, args.genres, args.seed)
+    print(
+        f"🏗️  Built index of {len(index)} artists in {time.perf_counter() - started:.2f} s"
+        f" ({index.nbytes() / 1_000_000:.1f} MB of arrays)"
+    )
+
+    rng = random.Random(args.seed + 1)
+    artist_ids = [f"artist-{rng.randrange(args.artists)}" for _ in range(args.queries)]
+    for artist_id in artist_ids[:50]:
+        index.similar(artist_id, args.k)  # warm up
+
+    latencies = []
+    for artist_id in artist_ids:
+        started = time.perf_counter()
+        index.similar(artist_id, args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(f"⏱️  top-{args.k} over {args.queries} queries: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+    if p99 > LATENCY_BUDGET_MS:
+        print(f"❌ p99 exceeds the {LATENCY_BUDGET_MS} ms budget")
+        sys.exit(1)
+    print(f"✅ Within the {LATENCY_BUDGET_MS} ms budget")
+
+if __name__ == "__main__":
+    main()
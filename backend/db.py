@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.database import Database
 from pymongo.collection import Collection
 import os
@@ -9,6 +9,7 @@ load_dotenv()
 # MongoDB connection
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "musical_events")
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
 
 client = MongoClient(MONGODB_URL)
 database: Database = client[DATABASE_NAME]
@@ -16,10 +17,65 @@ database: Database = client[DATABASE_NAME]
 # Collections
 users_collection: Collection = database["users"]
 artist_applications_collection: Collection = database["artist_applications"]
+artist_applications_archive_collection: Collection = database["artist_applications_archive"]
 artists_collection: Collection = database["artists"]
+idempotency_keys_collection: Collection = database["idempotency_keys"]
+audit_log_collection: Collection = database["audit_log"]
+revoked_tokens_collection: Collection = database["revoked_tokens"]
+activity_rollups_collection: Collection = database["activity_rollups"]
 
 def get_database():
     return database
 
+def ensure_indexes():
+    """Create the indexes the application relies on (no-op if they already exist)"""
+    # Registration is a single insert guarded by this index
+    users_collection.create_index([("email", ASCENDING)], unique=True)
+    
+    # At most one pending or approved application per user; requires MongoDB 6.0+ ($in in a partial filter)
+    artist_applications_collection.create_index(
+        [("user_id", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"status": {"$in": ["pending", "approved"]}},
+        name="user_id_active_application_unique"
+    )
+    
+    # One artist record per user; approval upserts against it
+    artists_collection.create_index([("user_id", ASCENDING)], unique=True)
+    # Recommendation index refresh picks up recently created artists
+    artists_collection.create_index([("created_at", ASCENDING)])
+    
+    # Admin listing reads applications newest-first; email sync updates by user
+    artist_applications_collection.create_index([("created_at", DESCENDING)])
+    artist_applications_collection.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
+    
+    # Duplicate detection looks up LSH band keys and normalized portfolio links
+    for collection in (artist_applications_collection, artist_applications_archive_collection):
+        collection.create_index([("dedup_bands", ASCENDING)])
+        collection.create_index([("portfolio_keys", ASCENDING)])
+    
+    # Archival scans decided applications by decision time; archived history is read per user
+    artist_applications_collection.create_index([("status", ASCENDING), ("updated_at", ASCENDING)])
+    artist_applications_archive_collection.create_index([("user_id", ASCENDING)])
+    artist_applications_archive_collection.create_index([("status", ASCENDING)])
+    
+    # Stored Idempotency-Key results expire after IDEMPOTENCY_KEY_TTL_SECONDS
+    idempotency_keys_collection.create_index(
+        [("created_at", ASCENDING)],
+        expireAfterSeconds=IDEMPOTENCY_KEY_TTL_SECONDS
+    )
+    
+    # Revocations disappear once the tokens they cover have expired; workers sync by revoked_at
+    revoked_tokens_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+    revoked_tokens_collection.create_index([("revoked_at", ASCENDING)])
+    
+    # Trend queries read a range of buckets for one metric
+    activity_rollups_collection.create_index([("granularity", ASCENDING), ("metric", ASCENDING), ("bucket", ASCENDING)])
+    
+    # Audit log queries page newest-first, optionally filtered by target or actor
+    audit_log_collection.create_index([("created_at", DESCENDING)])
+    audit_log_collection.create_index([("target_id", ASCENDING), ("created_at", DESCENDING)])
+    audit_log_collection.create_index([("actor_id", ASCENDING), ("created_at", DESCENDING)])
+
 def close_database():
     client.close()
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+Near-duplicate detection for artist applications.
+
+Each application stores, next to its data,
+  - dedup_signature: a MinHash signature of its stage name's character trigrams,
+  - dedup_bands: LSH band keys derived from that signature,
+  - portfolio_keys: its portfolio links normalized (no scheme, www, tracking
+    parameters, trailing slash, case; identifying query parameters such as
+    YouTube's v are kept).
+Both arrays are indexed (multikey), so finding candidates for a new
+application is an index lookup on its band keys and links rather than a
+comparison against every past application. Candidates from other users are
+then confirmed by estimated stage name similarity or a shared portfolio link.
+
+With DEDUP_BANDS bands of DEDUP_ROWS rows, stage names with trigram Jaccard
+similarity around (1 / DEDUP_BANDS) ** (1 / DEDUP_ROWS) (~0.5) or more
+are likely to share a band and be compared.
+"""
+
+import hashlib
+import os
+import random
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from db import artist_applications_collection, artist_applications_archive_collection
+
+load_dotenv()
+
+# Configuration
+DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.6"))
+DUPLICATE_MAX_CANDIDATES = int(os.getenv("DUPLICATE_MAX_CANDIDATES", "200"))
+
+DEDUP_BANDS = 16
+DEDUP_ROWS = 4
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Query parameters that never identify the linked page
+TRACKING_PARAMS = {"si", "feature", "fbclid", "gclid", "igshid", "ref", "ref_src", "t", "start"}
+
+# Fixed seed: signatures are persisted, so the hash family must never change
+_hash_rng = random.Random(20240818)
+_HASH_PARAMS = [
+    (_hash_rng.randrange(1, _MERSENNE_PRIME), _hash_rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(DEDUP_BANDS * DEDUP_ROWS)
+]
+
+def normalize_stage_name(stage_name: str) -> str:
+    """Lowercase and strip accents, punctuation and spaces ("D.J. Nová" -> "djnova")"""
+    decomposed = unicodedata.normalize("NFKD", stage_name)
+    ascii_name = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", "", ascii_name.lower())
+
+def stage_name_trigrams(stage_name: str) -> Set[str]:
+    normalized = normalize_stage_name(stage_name)
+    if not normalized:
+        return set()
+    padded = f"  {normalized} "  # Pad so short names still yield trigrams
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def normalize_portfolio_link(link: str) -> Optional[str]:
+    """Reduce a link to host, path and identifying query so trivial variants of the same URL match"""
+    link = link.strip()
+    if not link:
+        return None
+    parts = urlsplit(link if "://" in link else f"//{link}")
+    host = parts.netloc.lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    if not host:
+        return None
+    path = parts.path.rstrip("/").lower()
+    # Keep e.g. watch?v=... and profile.php?id=..., which name the actual page
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parts.query)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith("utm_")
+    )
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{host}{path}{query}"
+
+def minhash_signature(shingles: Iterable[str]) -> List[int]:
+    hashed = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        for shingle in shingles
+    ]
+    if not hashed:
+        return []
+    return [min((a * value + b) % _MERSENNE_PRIME for value in hashed) for a, b in _HASH_PARAMS]
+
+def lsh_bands(signature: List[int]) -> List[str]:
+    if not signature:
+        return []
+    bands = []
+    for band in range(DEDUP_BANDS):
+        rows = signature[band * DEDUP_ROWS:(band + 1) * DEDUP_ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).hexdigest()
+        bands.append(f"{band}:{digest}")
+    return bands
+
+def estimated_similarity(signature: List[int], other: List[int]) -> float:
+    if not signature or len(signature) != len(other):
+        return 0.0
+    return sum(1 for mine, theirs in zip(signature, other) if mine == theirs) / len(signature)
+
+def dedup_fields(stage_name: str, portfolio_links: Iterable[str]) -> dict:
+    """Fields stored on an application so it can be matched against later ones"""
+    signature = minhash_signature(stage_name_trigrams(stage_name))
+    portfolio_keys = sorted({key for key in map(normalize_portfolio_link, portfolio_links) if key})
+    return {
+        "dedup_signature": signature,
+        "dedup_bands": lsh_bands(signature),
+        "portfolio_keys": portfolio_keys
+    }
+
+def find_possible_duplicates(fields: dict, user_id: ObjectId, exclude_id: Optional[ObjectId] = None) -> List[ObjectId]:
+    """Find other users' applications (live or archived) that look like the same act"""
+    clauses = []
+    if fields["dedup_bands"]:
+        clauses.append({"dedup_bands": {"$in": fields["dedup_bands"]}})
+    if fields["portfolio_keys"]:
+        clauses.append({"portfolio_keys": {"$in": fields["portfolio_keys"]}})
+    if not clauses:
+        return []
+
+    query = {"$or": clauses, "user_id": {"$ne": user_id}}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    projection = {"dedup_signature": 1, "portfolio_keys": 1}
+    portfolio_keys = set(fields["portfolio_keys"])
+
+    duplicates = []
+    for collection in (artist_applications_collection, artist_applications_archive_collection):
+        for candidate in collection.find(query, projection).limit(DUPLICATE_MAX_CANDIDATES):
+            shares_link = bool(portfolio_keys.intersection(candidate.get("portfolio_keys", [])))
+            similarity = estimated_similarity(fields["dedup_signature"], candidate.get("dedup_signature", []))
+            if shares_link or similarity >= DUPLICATE_SIMILARITY_THRESHOLD:
+                duplicates.append(candidate["_id"])
+    return duplicates
+
+def link_duplicates(application_id: ObjectId, duplicate_ids: List[ObjectId]):
+    """Record the new application on the applications it duplicates"""
+    if not duplicate_ids:
+        return
+    for collection in (artist_applications_collection, artist_applications_archive_collection):
+        collection.update_many(
+            {"_id": {"$in": duplicate_ids}},
+            {"$addToSet": {"possible_duplicates": application_id}}
+        )
@@ -0,0 +1,77 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+from pymongo.errors import DuplicateKeyError
+
+from db import idempotency_keys_collection
+
+load_dotenv()
+
+# Configuration
+IDEMPOTENCY_CLAIM_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_CLAIM_LEASE_SECONDS", "60"))
+
+def _take_over_stale_claim(key_id: str, claim_id: str) -> bool:
+    """Take over an in-progress claim whose lease ran out (its worker likely died)"""
+    now = datetime.utcnow()
+    return idempotency_keys_collection.find_one_and_update(
+        {
+            "_id": key_id,
+            "response": None,
+            "claimed_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_CLAIM_LEASE_SECONDS)}
+        },
+        {"$set": {"claim_id": claim_id, "claimed_at": now}}
+    ) is not None
+
+def run_idempotent(scope: str, idempotency_key: Optional[str], operation: Callable[[], dict]) -> dict:
+    """Run a write operation at most once per Idempotency-Key.
+
+    The key is claimed with a single insert before the operation runs. A retry
+    with the same key gets the stored response of the first attempt instead of
+    repeating the work. If the operation fails the claim is released so the
+    client can retry. A claim still without a response after
+    IDEMPOTENCY_CLAIM_LEASE_SECONDS is taken over by the next retry, so a
+    worker dying mid-operation does not block the key until it expires; the
+    writes themselves stay guarded by their unique indexes. Without a key the
+    operation simply runs.
+    """
+    if not idempotency_key:
+        return operation()
+
+    key_id = f"{scope}:{idempotency_key}"
+    claim_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    try:
+        idempotency_keys_collection.insert_one({
+            "_id": key_id,
+            "response": None,
+            "claim_id": claim_id,
+            "claimed_at": now,
+            "created_at": now
+        })
+    except DuplicateKeyError:
+        record = idempotency_keys_collection.find_one({"_id": key_id})
+        if record and record.get("response") is not None:
+            return record["response"]
+        if not _take_over_stale_claim(key_id, claim_id):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is already in progress"
+            )
+
+    # Only act on the claim while it is still ours
+    claim = {"_id": key_id, "claim_id": claim_id}
+    try:
+        response = operation()
+    except Exception:
+        idempotency_keys_collection.delete_one(claim)
+        raise
+
+    idempotency_keys_collection.update_one(
+        claim,
+        {"$set": {"response": response}}
+    )
+    return response
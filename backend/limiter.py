@@ -0,0 +1,131 @@
+"""
+Per-worker concurrency limiting and load shedding.
+
+ConcurrencyLimitMiddleware caps in-flight requests per route class: expensive
+routes (password hashing, admin aggregation) get small limits of their own so
+they cannot starve cheap ones. A request over its class limit waits up to
+CONCURRENCY_QUEUE_TIMEOUT_SECONDS for a slot, with at most
+CONCURRENCY_MAX_QUEUE requests waiting per class; otherwise it is shed with a
+503 and a Retry-After header. Health and metrics endpoints are never limited.
+
+Limits are per process, so the effective cap is the limit times the number of
+uvicorn workers.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+from starlette.responses import JSONResponse
+
+load_dotenv()
+
+# Configuration
+CONCURRENCY_LIMIT_ENABLED = os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true"
+CONCURRENCY_LIMIT_AUTH = int(os.getenv("CONCURRENCY_LIMIT_AUTH", "4"))
+CONCURRENCY_LIMIT_ADMIN = int(os.getenv("CONCURRENCY_LIMIT_ADMIN", "8"))
+CONCURRENCY_LIMIT_DEFAULT = int(os.getenv("CONCURRENCY_LIMIT_DEFAULT", "64"))
+CONCURRENCY_MAX_QUEUE = int(os.getenv("CONCURRENCY_MAX_QUEUE", "100"))
+CONCURRENCY_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CONCURRENCY_QUEUE_TIMEOUT_SECONDS", "2.0"))
+CONCURRENCY_RETRY_AFTER_SECONDS = int(os.getenv("CONCURRENCY_RETRY_AFTER_SECONDS", "1"))
+
+EXEMPT_PATHS = {"/health", "/metrics"}
+
+class RouteClassLimiter:
+    """Bounded-wait semaphore for one route class, with counters for metrics"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting a bounded time; returns False if the request should be shed"""
+        if self._semaphore.locked():
+            if self.waiting >= CONCURRENCY_MAX_QUEUE:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            try:
+                # wait_for cancels the inner acquire on timeout and when this
+                # task is cancelled (client gone, shutdown), so no slot leaks
+                await asyncio.wait_for(self._semaphore.acquire(), CONCURRENCY_QUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected
+        }
+
+# Path prefixes (as mounted under /api) for each expensive route class;
+# everything else falls into the default class
+ROUTE_CLASSES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("auth", ("/api/auth/login", "/api/auth/register")),
+    ("admin", ("/api/admin", "/api/dashboard/admin")),
+]
+
+route_class_limiters: Dict[str, RouteClassLimiter] = {
+    "auth": RouteClassLimiter("auth", CONCURRENCY_LIMIT_AUTH),
+    "admin": RouteClassLimiter("admin", CONCURRENCY_LIMIT_ADMIN),
+    "default": RouteClassLimiter("default", CONCURRENCY_LIMIT_DEFAULT),
+}
+
+def classify_path(path: str) -> str:
+    for name, prefixes in ROUTE_CLASSES:
+        if path.startswith(prefixes):
+            return name
+    return "default"
+
+def concurrency_stats() -> dict:
+    """Queue depth, in-flight and rejection counters per route class"""
+    return {name: limiter.stats() for name, limiter in route_class_limiters.items()}
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware that limits in-flight requests per route class"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = route_class_limiters[classify_path(scope["path"])]
+        if not await limiter.acquire():
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(CONCURRENCY_RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -2,15 +2,30 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-# Only import auth for now to test
-from routes import auth
-from db import close_database
+# Only import auth for now to test, plus admin, the composite dashboards and recommendations
+from routes import auth, admin, dashboard, recommendations
+from db import close_database, ensure_indexes
+from audit import start_audit_writer, stop_audit_writer
+from archival import start_archiver, stop_archiver
+from revocation import start_revocation_sync, stop_revocation_sync
+from recommendations import start_recommendations, stop_recommendations
+from profiling import PROFILING_ENABLED, ProfilingMiddleware
+from limiter import CONCURRENCY_LIMIT_ENABLED, ConcurrencyLimitMiddleware, concurrency_stats
 
 @asynccontextmanager  
 async def lifespan(app: FastAPI):
     print("🚀 Musical Event Management API starting up...")
+    ensure_indexes()
+    await start_audit_writer()
+    await start_archiver()
+    await start_revocation_sync()
+    await start_recommendations()
     yield
     print("🔄 Shutting down...")
+    await stop_recommendations()
+    await stop_revocation_sync()
+    await stop_archiver()
+    await stop_audit_writer()
     close_database()
 
 app = FastAPI(
@@ -20,6 +35,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Load shedding; added before CORS so rejected requests still get CORS headers
+if CONCURRENCY_LIMIT_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -29,8 +48,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include only auth router for testing
+# Opt-in request profiling; not installed at all unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Include only auth router for testing, plus admin (reviews, audit log, trends,
+# token revocation), the dashboards the frontend loads and the recommendations
+# served from the index built in lifespan
 app.include_router(auth.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
+app.include_router(recommendations.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -38,4 +66,8 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics")
+async def metrics():
+    return {"concurrency": concurrency_stats()}
\ No newline at end of file
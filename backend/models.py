@@ -63,12 +63,14 @@ class ArtistApplication(BaseModel):
     
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: PyObjectId
+    email: Optional[str] = None  # Denormalized from users for the admin listing
     stage_name: str
     genres: List[str]
     bio: str
     portfolio_links: List[str]
     status: str = "pending"  # pending/approved/rejected
     reviewed_by: Optional[PyObjectId] = None
+    possible_duplicates: List[PyObjectId] = Field(default_factory=list)  # Other users' look-alike applications
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -91,4 +93,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
-    role: Optional[int] = None
\ No newline at end of file
+    role: Optional[int] = None
+    jti: Optional[str] = None
+    iat: Optional[int] = None
+    iat_ms: Optional[int] = None
+    exp: Optional[int] = None
\ No newline at end of file
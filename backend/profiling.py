@@ -0,0 +1,235 @@
+"""
+Opt-in per-request CPU profiling.
+
+Nothing in this module runs unless PROFILING_ENABLED is set: main_backup.py only
+installs ProfilingMiddleware when it is, so the normal request path carries no
+profiling overhead at all.
+
+When enabled, a request is profiled if either
+  - it is sent by an admin and carries an `X-Profile: collapsed|calltree` header,
+    in which case the report is returned instead of the normal response body
+    (the original status code is kept in `X-Profile-Status`), or
+  - it is picked by PROFILE_SAMPLE_RATE, in which case the response is untouched
+    and a collapsed-stack report is written to a bounded on-disk ring buffer.
+
+The profiler hooks the event loop thread, so it sees async handlers and the
+blocking pymongo and bcrypt calls they make. Sync dependencies that FastAPI runs
+in its threadpool (e.g. verify_token) are not captured, and other requests
+interleaved on the loop while the profiled one is awaiting show up in the report.
+sys.setprofile is a single hook per thread, so only one request per worker is
+profiled at a time: while one is, sampling is skipped and an admin-requested
+profile gets a 409.
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+
+from auth import decode_access_token
+
+load_dotenv()
+
+# Configuration
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+
+PROFILE_HEADER = "x-profile"
+PROFILE_FORMATS = ("collapsed", "calltree")
+
+_sequence = itertools.count()
+_active_profiler: Optional["StackProfiler"] = None
+
+class StackProfiler:
+    """Deterministic profiler that accumulates self time per call stack"""
+
+    def __init__(self):
+        self.stacks: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._frames: List[str] = []
+        self._last = 0.0
+
+    def start(self) -> bool:
+        """Install the hook; returns False if another profile is already running"""
+        global _active_profiler
+        if _active_profiler is not None:
+            return False
+        _active_profiler = self
+        self._last = time.perf_counter()
+        sys.setprofile(self._on_event)
+        return True
+
+    def stop(self):
+        global _active_profiler
+        if _active_profiler is self:
+            sys.setprofile(None)
+            _active_profiler = None
+
+    def _on_event(self, frame, event, arg):
+        now = time.perf_counter()
+        if self._frames:
+            self.stacks[tuple(self._frames)] += now - self._last
+
+        if event == "call":
+            code = frame.f_code
+            self._frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        elif event == "c_call":
+            module = getattr(arg, "__module__", None) or "builtins"
+            self._frames.append(f"{module}.{getattr(arg, '__qualname__', repr(arg))}")
+        elif self._frames:
+            # return / c_return / c_exception. Frames entered before start()
+            # return while our stack is empty and are ignored.
+            self._frames.pop()
+
+        self._last = time.perf_counter()
+
+    def collapsed(self) -> str:
+        """Render in collapsed-stack format (one `a;b;c <microseconds>` line per stack)"""
+        lines = [
+            f"{';'.join(stack)} {int(seconds * 1_000_000)}"
+            for stack, seconds in sorted(self.stacks.items())
+            if seconds >= 0.000001
+        ]
+        return "\n".join(lines) + "\n"
+
+    def calltree(self, min_fraction: float = 0.005) -> str:
+        """Render as an indented call tree of inclusive times"""
+        root: dict = {"total": 0.0, "children": {}}
+        for stack, seconds in self.stacks.items():
+            root["total"] += seconds
+            node = root
+            for label in stack:
+                node = node["children"].setdefault(label, {"total": 0.0, "children": {}})
+                node["total"] += seconds
+
+        total = root["total"] or 1e-9
+        lines = [f"total {total * 1000:.3f} ms"]
+
+        def walk(node: dict, depth: int):
+            children = sorted(node["children"].items(), key=lambda item: item[1]["total"], reverse=True)
+            for label, child in children:
+                if child["total"] / total < min_fraction:
+                    continue
+                lines.append(
+                    f"{'  ' * depth}{child['total'] * 1000:9.3f} ms {child['total'] / total:6.1%}  {label}"
+                )
+                walk(child, depth + 1)
+
+        walk(root, 0)
+        return "\n".join(lines) + "\n"
+
+    def render(self, report_format: str) -> str:
+        if report_format == "collapsed":
+            return self.collapsed()
+        return self.calltree()
+
+def _requested_format(headers: Headers) -> Optional[str]:
+    """Return the report format if an admin asked for this request to be profiled"""
+    requested = headers.get(PROFILE_HEADER)
+    if not requested:
+        return None
+
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        token_data = decode_access_token(token)
+    except HTTPException:
+        return None
+    if token_data.role != 0:
+        return None
+
+    requested = requested.strip().lower()
+    return requested if requested in PROFILE_FORMATS else "calltree"
+
+def store_profile(report: str, method: str, path: str) -> str:
+    """Write a collapsed-stack report into the ring buffer, evicting the oldest entries"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    safe_path = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    filename = (
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_sequence):06d}"
+        f"-{method}-{safe_path}.collapsed"
+    )
+    filepath = os.path.join(PROFILE_DIR, filename)
+    with open(filepath, "w") as profile_file:
+        profile_file.write(report)
+
+    profiles = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".collapsed"))
+    for stale in profiles[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, stale))
+        except FileNotFoundError:
+            # Another worker already evicted it
+            pass
+
+    return filepath
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles admin-requested and sampled requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        report_format = _requested_format(Headers(scope=scope))
+        sampled = (
+            report_format is None
+            and PROFILE_SAMPLE_RATE > 0
+            and random.random() < PROFILE_SAMPLE_RATE
+        )
+        if report_format is None and not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = StackProfiler()
+
+        if sampled:
+            if not profiler.start():
+                # Another request is being profiled; skip this sample
+                await self.app(scope, receive, send)
+                return
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                profiler.stop()
+                await asyncio.to_thread(store_profile, profiler.collapsed(), scope["method"], scope["path"])
+            return
+
+        # Admin-requested: swallow the real response and return the report instead
+        response_status = {"status": 500}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response_status["status"] = message["status"]
+
+        if not profiler.start():
+            response = PlainTextResponse("Another request is being profiled, please retry shortly\n", status_code=409)
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            profiler.stop()
+
+        response = PlainTextResponse(
+            profiler.render(report_format),
+            headers={"X-Profile-Status": str(response_status["status"])},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,185 @@
+"""
+In-memory "similar artists" index.
+
+Artists are rows of a sparse artist-by-genre matrix with L2-normalized rows,
+so the cosine similarity of every artist to a query artist is one sparse
+matrix-vector product. The matrix is stored column-wise (CSC-style): each
+genre keeps an array of the rows of its artists, and every artist has the same
+weight in each of its genres. A query only accumulates scores over the query
+artist's genre columns, and memory grows with the number of (artist, genre)
+pairs rather than artists x distinct genres, which matters because genres are
+free text.
+
+The index is built from the artists collection at startup, updated in place
+when approve_application creates an artist, and refreshed every
+RECOMMENDATIONS_REFRESH_SECONDS with artists created by other workers.
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from db import artists_collection
+
+load_dotenv()
+
+# Configuration
+RECOMMENDATIONS_REFRESH_SECONDS = float(os.getenv("RECOMMENDATIONS_REFRESH_SECONDS", "30"))
+
+# Re-read this far back on every refresh so artists inserted with a slightly
+# older created_at by another worker are not missed
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+def normalize_genre(genre: str) -> str:
+    return " ".join(genre.lower().split())
+
+class GenreSimilarityIndex:
+    """Sparse artist-by-genre matrix answering top-k cosine similarity queries"""
+
+    def __init__(self, artist_capacity: int = 1024):
+        self._lock = threading.Lock()
+        # Column storage: genre -> rows of its artists (first _column_sizes[genre] entries are used)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._column_sizes: Dict[str, int] = {}
+        # Value of every non-zero entry in an artist's row (1 / sqrt(genre count))
+        self._weights = np.zeros(artist_capacity, dtype=np.float32)
+        self._artist_rows: Dict[str, int] = {}
+        self._artist_ids: List[str] = []
+        self._stage_names: List[str] = []
+        self._genres: List[List[str]] = []
+        self._normalized_genres: List[List[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._artist_ids)
+
+    def __contains__(self, artist_id: str) -> bool:
+        return artist_id in self._artist_rows
+
+    def _append_to_column(self, genre: str, row: int):
+        column = self._columns.get(genre)
+        size = self._column_sizes.get(genre, 0)
+        if column is None or size == column.size:
+            grown = np.empty(max(4, size * 2), dtype=np.int32)
+            if column is not None:
+                grown[:size] = column
+            self._columns[genre] = column = grown
+        column[size] = row
+        self._column_sizes[genre] = size + 1
+
+    def add_artist(self, artist_id: str, stage_name: str, genres: Iterable[str]) -> bool:
+        """Add one artist; returns False if it is already indexed"""
+        genres = list(genres)
+        normalized = sorted({normalize_genre(genre) for genre in genres if genre and genre.strip()})
+        with self._lock:
+            if artist_id in self._artist_rows:
+                return False
+
+            row = len(self._artist_ids)
+            if row == self._weights.size:
+                grown = np.zeros(self._weights.size * 2, dtype=np.float32)
+                grown[:row] = self._weights
+                self._weights = grown
+            if normalized:
+                self._weights[row] = 1.0 / np.sqrt(len(normalized))
+                for genre in normalized:
+                    self._append_to_column(genre, row)
+
+            self._artist_rows[artist_id] = row
+            self._artist_ids.append(artist_id)
+            self._stage_names.append(stage_name)
+            self._genres.append(genres)
+            self._normalized_genres.append(normalized)
+            return True
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the numeric arrays"""
+        return self._weights.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    def similar(self, artist_id: str, k: int = 10) -> Optional[List[dict]]:
+        """Top-k most similar artists by genre cosine similarity, or None if unknown"""
+        with self._lock:
+            row = self._artist_rows.get(artist_id)
+            if row is None:
+                return None
+
+            count = len(self._artist_ids)
+            genres = self._normalized_genres[row]
+            if not genres or count < 2:
+                return []
+
+            # Only the query's genre columns contribute to the dot products;
+            # an artist appears at most once per column, so += does not collide
+            query_weight = self._weights[row]
+            scores = np.zeros(count, dtype=np.float32)
+            for genre in genres:
+                rows = self._columns[genre][:self._column_sizes[genre]]
+                scores[rows] += query_weight * self._weights[rows]
+            scores[row] = -1.0
+
+            k = min(k, count - 1)
+            top = np.argpartition(scores, -k)[-k:]
+            top = top[np.argsort(scores[top])[::-1]]
+
+            return [
+                {
+                    "artist_id": self._artist_ids[index],
+                    "stage_name": self._stage_names[index],
+                    "genres": self._genres[index],
+                    "score": round(float(scores[index]), 4)
+                }
+                for index in top
+                if scores[index] > 0
+            ]
+
+similarity_index = GenreSimilarityIndex()
+
+_stop_event: Optional[asyncio.Event] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+def load_artists(since: Optional[datetime] = None) -> int:
+    """Add artists from the database (all, or created since a time); returns how many were new"""
+    query = {} if since is None else {"created_at": {"$gte": since - REFRESH_OVERLAP}}
+    added = 0
+    for artist in artists_collection.find(query, {"stage_name": 1, "genres": 1}):
+        if similarity_index.add_artist(str(artist["_id"]), artist.get("stage_name", ""), artist.get("genres", [])):
+            added += 1
+    return added
+
+async def _run_refresh(last_refresh: datetime):
+    while True:
+        try:
+            await asyncio.wait_for(_stop_event.wait(), RECOMMENDATIONS_REFRESH_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        refresh_started = datetime.utcnow()
+        try:
+            await asyncio.to_thread(load_artists, last_refresh)
+            last_refresh = refresh_started
+        except Exception as e:
+            print(f"❌ Recommendation index refresh failed, will retry: {e}")
+
+async def start_recommendations():
+    """Build the index and start the periodic refresh (called from the app lifespan)"""
+    global _stop_event, _refresh_task
+    loaded_at = datetime.utcnow()
+    added = await asyncio.to_thread(load_artists)
+    print(f"🎧 Indexed {added} artists for recommendations")
+    _stop_event = asyncio.Event()
+    _refresh_task = asyncio.create_task(_run_refresh(loaded_at))
+
+async def stop_recommendations():
+    """Stop the periodic refresh"""
+    global _stop_event, _refresh_task
+    if _refresh_task is None:
+        return
+    _stop_event.set()
+    await _refresh_task
+    _stop_event = None
+    _refresh_task = None
@@ -0,0 +1,202 @@
+"""
+Access token revocation.
+
+Revocations are stored in the revoked_tokens collection, either for a single
+token (by its jti claim) or for all of a user's tokens issued before a cutoff.
+Every entry carries the time after which it no longer matters (when the
+token(s) it covers expire), and a TTL index removes it from the store then.
+
+verify_token never reads the store. Each worker keeps an in-memory denylist:
+a Bloom filter in front of an exact jti map, so the common case (a token that
+was never revoked) is answered by a few bit probes. A background task pulls
+revocations made by other workers every REVOCATION_SYNC_SECONDS and prunes
+expired entries every REVOCATION_PRUNE_SECONDS. Revocations made by this
+worker apply immediately.
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from db import revoked_tokens_collection
+
+load_dotenv()
+
+# Configuration
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+REVOCATION_PRUNE_SECONDS = float(os.getenv("REVOCATION_PRUNE_SECONDS", "60"))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+# Re-read this far back on every sync so revocations written with a slightly
+# older timestamp by another worker are not missed
+SYNC_OVERLAP = timedelta(seconds=60)
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class TokenDenylist:
+    """In-memory view of revoked tokens and per-user revocation cutoffs.
+
+    Lookups are lock-free (they run in FastAPI's threadpool); writers take a
+    lock and pruning swaps in freshly built structures.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}  # jti -> expiry timestamp
+        self._user_cutoffs: Dict[str, Tuple[float, float]] = {}  # user_id -> (not_before, expiry)
+        self._bloom = BloomFilter(REVOCATION_BLOOM_CAPACITY, REVOCATION_BLOOM_ERROR_RATE)
+
+    def add_token(self, jti: str, expires_at: float):
+        with self._lock:
+            # Exact map first so a Bloom hit always finds the entry
+            self._tokens[jti] = expires_at
+            self._bloom.add(jti)
+
+    def add_user_cutoff(self, user_id: str, not_before: float, expires_at: float):
+        with self._lock:
+            current = self._user_cutoffs.get(user_id)
+            if current is None or not_before > current[0]:
+                self._user_cutoffs[user_id] = (not_before, expires_at)
+
+    def is_revoked(self, jti: Optional[str], user_id: str, issued_at: Optional[float]) -> bool:
+        # issued_at comes from the millisecond iat_ms claim, so a token issued
+        # in the same second as (but after) a user cutoff stays valid
+        cutoff = self._user_cutoffs.get(user_id)
+        if cutoff is not None and (issued_at is None or issued_at < cutoff[0]):
+            return True
+        if jti is None:
+            return False
+        return jti in self._bloom and jti in self._tokens
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop expired entries and rebuild the Bloom filter; returns how many were dropped"""
+        now = now or time.time()
+        with self._lock:
+            tokens = {jti: expiry for jti, expiry in self._tokens.items() if expiry > now}
+            user_cutoffs = {user_id: cutoff for user_id, cutoff in self._user_cutoffs.items() if cutoff[1] > now}
+            bloom = BloomFilter(max(REVOCATION_BLOOM_CAPACITY, 2 * len(tokens)), REVOCATION_BLOOM_ERROR_RATE)
+            for jti in tokens:
+                bloom.add(jti)
+            dropped = len(self._tokens) - len(tokens) + len(self._user_cutoffs) - len(user_cutoffs)
+            self._tokens, self._user_cutoffs, self._bloom = tokens, user_cutoffs, bloom
+        return dropped
+
+    def load(self, entry: dict):
+        """Add one revoked_tokens document"""
+        # pymongo returns naive UTC datetimes
+        expires_at = entry["expires_at"].replace(tzinfo=timezone.utc).timestamp()
+        if entry["kind"] == "user":
+            self.add_user_cutoff(entry["user_id"], entry["not_before"], expires_at)
+        else:
+            self.add_token(entry["_id"], expires_at)
+
+denylist = TokenDenylist()
+
+_stop_event: Optional[asyncio.Event] = None
+_sync_task: Optional[asyncio.Task] = None
+
+def is_token_revoked(jti: Optional[str], user_id: str, issued_at: Optional[float]) -> bool:
+    """Check the in-memory denylist (no database access)"""
+    return denylist.is_revoked(jti, user_id, issued_at)
+
+def revoke_token(jti: str, user_id: str, expires_at: float):
+    """Revoke a single token until it expires"""
+    revoked_tokens_collection.update_one(
+        {"_id": jti},
+        {"$setOnInsert": {
+            "kind": "token",
+            "user_id": user_id,
+            "expires_at": datetime.utcfromtimestamp(expires_at),
+            "revoked_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+    denylist.add_token(jti, expires_at)
+
+def revoke_user_tokens(user_id: str, max_token_lifetime: timedelta):
+    """Revoke every token issued to a user up to now"""
+    now = time.time()
+    expires_at = now + max_token_lifetime.total_seconds()
+    revoked_tokens_collection.insert_one({
+        "kind": "user",
+        "user_id": user_id,
+        "not_before": now,
+        "expires_at": datetime.utcfromtimestamp(expires_at),
+        "revoked_at": datetime.utcnow()
+    })
+    denylist.add_user_cutoff(user_id, now, expires_at)
+
+def _load_revocations(since: Optional[datetime]) -> int:
+    query = {"expires_at": {"$gt": datetime.utcnow()}}
+    if since is not None:
+        query["revoked_at"] = {"$gte": since - SYNC_OVERLAP}
+    count = 0
+    for entry in revoked_tokens_collection.find(query):
+        denylist.load(entry)
+        count += 1
+    return count
+
+async def _run_sync(last_sync: datetime):
+    last_prune = time.monotonic()
+    while True:
+        try:
+            await asyncio.wait_for(_stop_event.wait(), REVOCATION_SYNC_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        sync_started = datetime.utcnow()
+        try:
+            await asyncio.to_thread(_load_revocations, last_sync)
+            last_sync = sync_started
+        except Exception as e:
+            print(f"❌ Token revocation sync failed, will retry: {e}")
+
+        if time.monotonic() - last_prune >= REVOCATION_PRUNE_SECONDS:
+            denylist.prune()
+            last_prune = time.monotonic()
+
+async def start_revocation_sync():
+    """Load current revocations and start the periodic sync (called from the app lifespan)"""
+    global _stop_event, _sync_task
+    loaded_at = datetime.utcnow()
+    await asyncio.to_thread(_load_revocations, None)
+    _stop_event = asyncio.Event()
+    _sync_task = asyncio.create_task(_run_sync(loaded_at))
+
+async def stop_revocation_sync():
+    """Stop the periodic sync"""
+    global _stop_event, _sync_task
+    if _sync_task is None:
+        return
+    _stop_event.set()
+    await _sync_task
+    _stop_event = None
+    _sync_task = None
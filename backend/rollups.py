@@ -0,0 +1,95 @@
+"""
+Pre-aggregated activity counts for trend views.
+
+Every registration, application submission and review increments an hourly
+and a daily bucket document in activity_rollups (one upserting bulk write),
+so a trend over any range is read from at most one document per bucket
+instead of scanning users or artist_applications. Weekly trends are summed
+from daily buckets. backfill_rollups.py rebuilds the buckets from existing
+data.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from db import activity_rollups_collection
+
+METRICS = (
+    "registrations",
+    "applications.submitted",
+    "applications.approved",
+    "applications.rejected",
+)
+STORED_GRANULARITIES = ("hour", "day")
+GRANULARITIES = ("hour", "day", "week")
+MAX_TREND_BUCKETS = 2000
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    return day
+
+def bucket_id(granularity: str, metric: str, bucket: datetime) -> str:
+    return f"{granularity}:{metric}:{bucket.isoformat()}"
+
+def record_activity(metric: str, at: Optional[datetime] = None, count: int = 1):
+    """Increment the hourly and daily buckets of a metric"""
+    at = at or datetime.utcnow()
+    updates = []
+    for granularity in STORED_GRANULARITIES:
+        bucket = bucket_start(at, granularity)
+        updates.append(UpdateOne(
+            {"_id": bucket_id(granularity, metric, bucket)},
+            {
+                "$inc": {"count": count},
+                "$setOnInsert": {"granularity": granularity, "metric": metric, "bucket": bucket}
+            },
+            upsert=True
+        ))
+    try:
+        activity_rollups_collection.bulk_write(updates, ordered=False)
+    except PyMongoError as e:
+        # Trends are best-effort; never fail the user's request over them
+        print(f"❌ Could not record {metric} activity: {e}")
+
+def _step(bucket: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return bucket + timedelta(hours=1)
+    if granularity == "week":
+        return bucket + timedelta(weeks=1)
+    return bucket + timedelta(days=1)
+
+def fetch_trend(metric: str, granularity: str, start: datetime, end: datetime) -> List[dict]:
+    """Counts per bucket from start up to (not including) end, with empty buckets as 0"""
+    stored_granularity = "day" if granularity == "week" else granularity
+    first_bucket = bucket_start(start, granularity)
+
+    counts: Dict[datetime, int] = {}
+    for rollup in activity_rollups_collection.find(
+        {
+            "granularity": stored_granularity,
+            "metric": metric,
+            "bucket": {"$gte": first_bucket, "$lt": end}
+        },
+        {"bucket": 1, "count": 1}
+    ):
+        bucket = bucket_start(rollup["bucket"], granularity)
+        counts[bucket] = counts.get(bucket, 0) + rollup["count"]
+
+    trend = []
+    bucket = first_bucket
+    while bucket < end:
+        trend.append({"bucket": bucket, "count": counts.get(bucket, 0)})
+        bucket = _step(bucket, granularity)
+    return trend
+
+def trend_bucket_count(granularity: str, start: datetime, end: datetime) -> int:
+    span = end - bucket_start(start, granularity)
+    unit = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[granularity]
+    return max(0, -(-span // unit))
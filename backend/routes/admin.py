@@ -1,51 +1,56 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from bson import ObjectId
-from datetime import datetime
-from typing import List
+from pymongo import ReturnDocument
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
 from models import Artist
-from auth import require_admin, TokenData
-from db import artist_applications_collection, artists_collection, users_collection
+from auth import require_admin, TokenData, ACCESS_TOKEN_EXPIRE_MINUTES
+from db import (
+    artist_applications_collection,
+    artist_applications_archive_collection,
+    artists_collection,
+    users_collection,
+    audit_log_collection,
+)
+from audit import record_audit_event
+from revocation import revoke_user_tokens
+from recommendations import similarity_index
+from rollups import METRICS, GRANULARITIES, MAX_TREND_BUCKETS, record_activity, fetch_trend, trend_bucket_count
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-@router.get("/applications", response_model=List[dict])
-async def get_all_applications(token_data: TokenData = Depends(require_admin)):
-    """Get all artist applications (admin only)"""
-    # Aggregate applications with user email
-    pipeline = [
-        {
-            "$lookup": {
-                "from": "users",
-                "localField": "user_id",
-                "foreignField": "_id",
-                "as": "user"
-            }
-        },
-        {
-            "$unwind": "$user"
-        },
-        {
-            "$project": {
-                "_id": 1,
-                "user_id": 1,
-                "stage_name": 1,
-                "genres": 1,
-                "bio": 1,
-                "portfolio_links": 1,
-                "status": 1,
-                "reviewed_by": 1,
-                "created_at": 1,
-                "updated_at": 1,
-                "email": "$user.email"
-            }
-        },
-        {
-            "$sort": {"created_at": -1}
-        }
-    ]
-    
-    applications = list(artist_applications_collection.aggregate(pipeline))
+# Fields shown in the admin listing; email is denormalized onto the
+# application at submit time so no join with users is needed
+APPLICATION_LIST_PROJECTION = {
+    "_id": 1,
+    "user_id": 1,
+    "email": 1,
+    "stage_name": 1,
+    "genres": 1,
+    "bio": 1,
+    "portfolio_links": 1,
+    "status": 1,
+    "reviewed_by": 1,
+    "possible_duplicates": 1,
+    "created_at": 1,
+    "updated_at": 1
+}
+
+def fetch_all_applications(include_archived: bool = False) -> List[dict]:
+    """Query all artist applications with applicant email, newest first"""
+    if include_archived:
+        applications = list(artist_applications_collection.aggregate([
+            {"$unionWith": {"coll": artist_applications_archive_collection.name}},
+            {"$project": APPLICATION_LIST_PROJECTION},
+            {"$sort": {"created_at": -1}}
+        ]))
+    else:
+        # Single read served by the created_at index
+        applications = list(
+            artist_applications_collection.find({}, APPLICATION_LIST_PROJECTION)
+            .sort("created_at", -1)
+        )
     
     # Convert ObjectId to string for JSON serialization
     for app in applications:
@@ -53,15 +58,20 @@ async def get_all_applications(token_data: TokenData = Depends(require_admin)):
         app["user_id"] = str(app["user_id"])
         if app.get("reviewed_by"):
             app["reviewed_by"] = str(app["reviewed_by"])
+        app["possible_duplicates"] = [str(duplicate_id) for duplicate_id in app.get("possible_duplicates", [])]
     
     return applications
 
-@router.post("/applications/{application_id}/approve", response_model=dict)
-async def approve_application(
-    application_id: str,
+@router.get("/applications", response_model=List[dict])
+async def get_all_applications(
+    include_archived: bool = False,
     token_data: TokenData = Depends(require_admin)
 ):
-    """Approve artist application (admin only)"""
+    """Get all artist applications (admin only)"""
+    return fetch_all_applications(include_archived)
+
+def _review_application(application_id: str, new_status: str, reviewer_id: str) -> dict:
+    """Atomically move a pending application to new_status; returns it as it was before"""
     # Validate ObjectId
     if not ObjectId.is_valid(application_id):
         raise HTTPException(
@@ -69,42 +79,55 @@ async def approve_application(
             detail="Invalid application ID"
         )
     
-    # Find application
-    application = artist_applications_collection.find_one({
-        "_id": ObjectId(application_id)
-    })
+    # Single conditional update: of any number of concurrent reviewers,
+    # exactly one matches the pending document
+    review_fields = {
+        "status": new_status,
+        "reviewed_by": ObjectId(reviewer_id),
+        "updated_at": datetime.utcnow()
+    }
+    application = artist_applications_collection.find_one_and_update(
+        {"_id": ObjectId(application_id), "status": "pending"},
+        {"$set": review_fields},
+        return_document=ReturnDocument.BEFORE
+    )
     
     if not application:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Application not found"
-        )
-    
-    if application["status"] != "pending":
+        # Lost the race or never pending; only now pay for a lookup to pick the error
+        if not artist_applications_collection.count_documents({"_id": ObjectId(application_id)}, limit=1):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Application is not pending"
         )
     
-    # Update application status
-    artist_applications_collection.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$set": {
-                "status": "approved",
-                "reviewed_by": ObjectId(token_data.user_id),
-                "updated_at": datetime.utcnow()
-            }
-        }
+    record_activity(f"applications.{new_status}")
+    record_audit_event(
+        f"application.{new_status}",
+        actor_id=ObjectId(reviewer_id),
+        target_id=application["_id"],
+        before=application,
+        after={**application, **review_fields}
     )
     
+    return application
+
+def _apply_approval(application: dict) -> bool:
+    """Promote the applicant and create their artist record; returns whether the artist was new.
+    
+    Both writes are idempotent, so this is safe to run again for an approval
+    whose side effects were lost (crash or error after the status update).
+    """
     # Promote user to artist role (role = 1)
     users_collection.update_one(
         {"_id": application["user_id"]},
         {"$set": {"role": 1}}
     )
     
-    # Create artist record
+    # Create artist record (unique on user_id)
     artist = Artist(
         user_id=application["user_id"],
         stage_name=application["stage_name"],
@@ -113,19 +136,39 @@ async def approve_application(
         portfolio_links=application["portfolio_links"]
     )
     
-    artists_collection.insert_one(artist.dict(by_alias=True))
+    result = artists_collection.update_one(
+        {"user_id": application["user_id"]},
+        {"$setOnInsert": artist.dict(by_alias=True)},
+        upsert=True
+    )
+    
+    # Make the new artist recommendable without waiting for the index refresh
+    if result.upserted_id is not None:
+        similarity_index.add_artist(str(result.upserted_id), artist.stage_name, artist.genres)
+        return True
+    return False
+
+@router.post("/applications/{application_id}/approve", response_model=dict)
+async def approve_application(
+    application_id: str,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Approve artist application (admin only)"""
+    # Side effects run only for the winning reviewer; losers get a 400
+    application = _review_application(application_id, "approved", token_data.user_id)
+    _apply_approval(application)
     
     return {
         "message": "Application approved successfully",
         "application_id": application_id
     }
 
-@router.post("/applications/{application_id}/reject", response_model=dict)
-async def reject_application(
+@router.post("/applications/{application_id}/repair", response_model=dict)
+async def repair_approval(
     application_id: str,
     token_data: TokenData = Depends(require_admin)
 ):
-    """Reject artist application (admin only)"""
+    """Re-apply the role change and artist record of an approved application (admin only)"""
     # Validate ObjectId
     if not ObjectId.is_valid(application_id):
         raise HTTPException(
@@ -133,53 +176,175 @@ async def reject_application(
             detail="Invalid application ID"
         )
     
-    # Find application
-    application = artist_applications_collection.find_one({
-        "_id": ObjectId(application_id)
-    })
-    
+    application = artist_applications_collection.find_one({"_id": ObjectId(application_id)})
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Application not found"
         )
-    
-    if application["status"] != "pending":
+    if application["status"] != "approved":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Application is not pending"
+            detail="Application is not approved"
         )
     
-    # Update application status
-    artist_applications_collection.update_one(
-        {"_id": ObjectId(application_id)},
-        {
-            "$set": {
-                "status": "rejected",
-                "reviewed_by": ObjectId(token_data.user_id),
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    artist_created = _apply_approval(application)
+    
+    return {
+        "message": "Approval repaired successfully",
+        "application_id": application_id,
+        "artist_created": artist_created
+    }
+
+@router.post("/applications/{application_id}/reject", response_model=dict)
+async def reject_application(
+    application_id: str,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Reject artist application (admin only)"""
+    _review_application(application_id, "rejected", token_data.user_id)
     
     return {
         "message": "Application rejected successfully",
         "application_id": application_id
     }
 
-@router.get("/stats", response_model=dict)
-async def get_admin_stats(token_data: TokenData = Depends(require_admin)):
-    """Get admin dashboard statistics"""
+def fetch_admin_stats(include_archived: bool = False) -> dict:
+    """Count users, artists and applications by status"""
     total_users = users_collection.count_documents({})
     total_artists = users_collection.count_documents({"role": 1})
     pending_applications = artist_applications_collection.count_documents({"status": "pending"})
     approved_applications = artist_applications_collection.count_documents({"status": "approved"})
     rejected_applications = artist_applications_collection.count_documents({"status": "rejected"})
     
+    # Only decided applications are ever archived
+    if include_archived:
+        approved_applications += artist_applications_archive_collection.count_documents({"status": "approved"})
+        rejected_applications += artist_applications_archive_collection.count_documents({"status": "rejected"})
+    
     return {
         "total_users": total_users,
         "total_artists": total_artists,
         "pending_applications": pending_applications,
         "approved_applications": approved_applications,
         "rejected_applications": rejected_applications
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats", response_model=dict)
+async def get_admin_stats(
+    include_archived: bool = False,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Get admin dashboard statistics"""
+    return fetch_admin_stats(include_archived)
+
+@router.get("/trends", response_model=dict)
+async def get_activity_trends(
+    metric: str = "registrations",
+    granularity: str = "day",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Get activity counts per hour, day or week from pre-aggregated rollups (admin only)"""
+    if metric not in METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown metric, expected one of: {', '.join(METRICS)}"
+        )
+    if granularity not in GRANULARITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown granularity, expected one of: {', '.join(GRANULARITIES)}"
+        )
+    
+    # Rollup buckets are naive UTC like every other stored datetime
+    if end and end.tzinfo:
+        end = end.astimezone(timezone.utc).replace(tzinfo=None)
+    if start and start.tzinfo:
+        start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    end = end or datetime.utcnow()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end"
+        )
+    if trend_bucket_count(granularity, start, end) > MAX_TREND_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range too large; at most {MAX_TREND_BUCKETS} buckets"
+        )
+    
+    return {
+        "metric": metric,
+        "granularity": granularity,
+        "buckets": fetch_trend(metric, granularity, start, end)
+    }
+
+@router.post("/users/{user_id}/revoke-tokens", response_model=dict)
+async def revoke_tokens_for_user(
+    user_id: str,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Revoke every token issued to a user so far, forcing a new login (admin only)"""
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user ID"
+        )
+    
+    # Tokens live at most ACCESS_TOKEN_EXPIRE_MINUTES, so the cutoff can be forgotten after that
+    revoke_user_tokens(user_id, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    
+    return {
+        "message": "User tokens revoked successfully",
+        "user_id": user_id
+    }
+
+def _stringify_object_ids(value):
+    """Recursively convert ObjectIds for JSON serialization"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _stringify_object_ids(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_stringify_object_ids(item) for item in value]
+    return value
+
+@router.get("/audit", response_model=dict)
+async def get_audit_log(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    target_id: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    action: Optional[str] = None,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Get audit log of review actions, newest first (admin only)"""
+    query = {}
+    for field, value in (("target_id", target_id), ("actor_id", actor_id)):
+        if value is not None:
+            if not ObjectId.is_valid(value):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid {field}"
+                )
+            query[field] = ObjectId(value)
+    if action is not None:
+        query["action"] = action
+    
+    events = list(
+        audit_log_collection.find(query)
+        .sort("created_at", -1)
+        .skip((page - 1) * page_size)
+        .limit(page_size)
+    )
+    total = audit_log_collection.count_documents(query)
+    
+    return {
+        "items": _stringify_object_ids(events),
+        "page": page,
+        "page_size": page_size,
+        "total": total
+    }
@@ -1,31 +1,25 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header
 from bson import ObjectId
 from datetime import datetime
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
 
 from models import ArtistApplicationCreate, ArtistApplication
 from auth import verify_token, TokenData
-from db import artist_applications_collection, users_collection
+from db import artist_applications_collection, artist_applications_archive_collection, users_collection
+from idempotency import run_idempotent
+from duplicates import dedup_fields, find_possible_duplicates, link_duplicates
+from rollups import record_activity
 
 router = APIRouter(prefix="/artist", tags=["artist"])
 
 @router.post("/apply", response_model=dict)
 async def submit_application(
     application_data: ArtistApplicationCreate,
-    token_data: TokenData = Depends(verify_token)
+    token_data: TokenData = Depends(verify_token),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Submit artist application"""
-    # Check if user already has a pending or approved application
-    existing_application = artist_applications_collection.find_one({
-        "user_id": ObjectId(token_data.user_id),
-        "status": {"$in": ["pending", "approved"]}
-    })
-    
-    if existing_application:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="You already have a pending or approved application"
-        )
-    
     # Parse portfolio links (split by newlines and filter empty strings)
     portfolio_links = [
         link.strip() for link in application_data.portfolio_links.split('\n') 
@@ -37,30 +31,83 @@ async def submit_application(
     if not genres:
         genres = [application_data.genre.strip()]
     
-    # Create application
-    application = ArtistApplication(
-        user_id=ObjectId(token_data.user_id),
-        stage_name=application_data.stage_name,
-        genres=genres,
-        bio=application_data.bio,
-        portfolio_links=portfolio_links,
-        status="pending"
-    )
-    
-    # Insert application into database
-    result = artist_applications_collection.insert_one(application.dict(by_alias=True))
+    def create_application():
+        # Copy the applicant's email onto the application for the admin listing
+        user = users_collection.find_one({"_id": ObjectId(token_data.user_id)}, {"email": 1, "role": 1})
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        
+        # Approved applications are eventually archived out of reach of the
+        # unique index, so artists are turned away by their stored role
+        if user.get("role") == 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You already have a pending or approved application"
+            )
+        
+        # Look up other users' applications for the same act (index lookups only)
+        duplicate_fields = dedup_fields(application_data.stage_name, portfolio_links)
+        possible_duplicates = find_possible_duplicates(duplicate_fields, ObjectId(token_data.user_id))
+        
+        # Create application
+        application = ArtistApplication(
+            user_id=ObjectId(token_data.user_id),
+            email=user["email"],
+            stage_name=application_data.stage_name,
+            genres=genres,
+            bio=application_data.bio,
+            portfolio_links=portfolio_links,
+            status="pending",
+            possible_duplicates=possible_duplicates
+        )
+        
+        # Single insert; the partial unique index on user_id rejects a second
+        # pending or approved application for the same user
+        try:
+            result = artist_applications_collection.insert_one({
+                **application.dict(by_alias=True),
+                **duplicate_fields
+            })
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You already have a pending or approved application"
+            )
+        
+        link_duplicates(result.inserted_id, possible_duplicates)
+        record_activity("applications.submitted")
+        
+        return {
+            "message": "Application submitted successfully",
+            "application_id": str(result.inserted_id)
+        }
     
-    return {
-        "message": "Application submitted successfully",
-        "application_id": str(result.inserted_id)
-    }
+    return run_idempotent(f"apply:{token_data.user_id}", idempotency_key, create_application)
 
-@router.get("/my-applications", response_model=list)
-async def get_my_applications(token_data: TokenData = Depends(verify_token)):
-    """Get current user's applications"""
-    applications = list(artist_applications_collection.find({
-        "user_id": ObjectId(token_data.user_id)
-    }))
+# Duplicate detection data is for reviewers only
+APPLICANT_HIDDEN_FIELDS = {
+    "possible_duplicates": 0,
+    "dedup_signature": 0,
+    "dedup_bands": 0,
+    "portfolio_keys": 0
+}
+
+def fetch_user_applications(user_id: str, include_archived: bool = False) -> list:
+    """Query a user's applications, optionally including archived ones"""
+    applications = list(artist_applications_collection.find(
+        {"user_id": ObjectId(user_id)},
+        APPLICANT_HIDDEN_FIELDS
+    ))
+    
+    # Decided applications older than ARCHIVE_AFTER_DAYS live in the archive
+    if include_archived:
+        applications.extend(artist_applications_archive_collection.find(
+            {"user_id": ObjectId(user_id)},
+            APPLICANT_HIDDEN_FIELDS
+        ))
     
     # Convert ObjectId to string for JSON serialization
     for app in applications:
@@ -69,4 +116,12 @@ async def get_my_applications(token_data: TokenData = Depends(verify_token)):
         if app.get("reviewed_by"):
             app["reviewed_by"] = str(app["reviewed_by"])
     
-    return applications
\ No newline at end of file
+    return applications
+
+@router.get("/my-applications", response_model=list)
+async def get_my_applications(
+    include_archived: bool = False,
+    token_data: TokenData = Depends(verify_token)
+):
+    """Get current user's applications"""
+    return fetch_user_applications(token_data.user_id, include_archived)
@@ -1,39 +1,50 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header
 from datetime import timedelta
+from typing import Optional
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
-from models import UserCreate, UserLogin, Token, User
-from auth import get_password_hash, verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user, verify_token
+from models import UserCreate, UserLogin, Token, User, TokenData
+from auth import get_password_hash, verify_and_update_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user, verify_token
+from revocation import revoke_token
+from rollups import record_activity
 from db import users_collection
+from idempotency import run_idempotent
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=dict)
-async def register(user_data: UserCreate):
+async def register(
+    user_data: UserCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = users_collection.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+    def create_user():
+        # Hash password and create user
+        hashed_password = get_password_hash(user_data.password)
+        user = User(
+            email=user_data.email,
+            password_hash=hashed_password,
+            role=getattr(user_data, 'role', 2)  # Default role is user (2)
         )
+        
+        # Single insert; the unique index on email rejects existing users
+        try:
+            result = users_collection.insert_one(user.dict(by_alias=True))
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
+            )
+        
+        record_activity("registrations")
+        
+        return {
+            "message": "User registered successfully",
+            "user_id": str(result.inserted_id)
+        }
     
-    # Hash password and create user
-    hashed_password = get_password_hash(user_data.password)
-    user = User(
-        email=user_data.email,
-        password_hash=hashed_password,
-        role=getattr(user_data, 'role', 2)  # Default role is user (2)
-    )
-    
-    # Insert user into database
-    result = users_collection.insert_one(user.dict(by_alias=True))
-    
-    return {
-        "message": "User registered successfully",
-        "user_id": str(result.inserted_id)
-    }
+    return run_idempotent(f"register:{user_data.email}", idempotency_key, create_user)
 
 @router.post("/login", response_model=Token)
 async def login(user_data: UserLogin):
@@ -47,12 +58,21 @@ async def login(user_data: UserLogin):
         )
     
     # Verify password
-    if not verify_password(user_data.password, user["password_hash"]):
+    valid, new_password_hash = verify_and_update_password(user_data.password, user["password_hash"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Transparently rehash with the configured scheme and cost; conditional on
+    # the old hash so a concurrent password change is not overwritten
+    if new_password_hash:
+        users_collection.update_one(
+            {"_id": user["_id"], "password_hash": user["password_hash"]},
+            {"$set": {"password_hash": new_password_hash}}
+        )
+    
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -73,4 +93,17 @@ async def get_current_user_info(current_user = Depends(get_current_user)):
         "email": current_user["email"],
         "role": current_user["role"],
         "created_at": current_user.get("created_at")
-    }
\ No newline at end of file
+    }
+
+@router.post("/logout", response_model=dict)
+async def logout(token_data: TokenData = Depends(verify_token)):
+    """Revoke the JWT token used for this request"""
+    if token_data.jti is None or token_data.exp is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token cannot be revoked"
+        )
+    
+    revoke_token(token_data.jti, token_data.user_id, token_data.exp)
+    
+    return {"message": "Logged out successfully"}
\ No newline at end of file
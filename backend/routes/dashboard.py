@@ -0,0 +1,76 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from bson import ObjectId
+from typing import Optional
+
+from auth import require_admin, require_artist, require_user, TokenData
+from db import artists_collection
+from routes.admin import fetch_all_applications, fetch_admin_stats
+from routes.artist import fetch_user_applications
+from routes.user import fetch_user_profile
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Each dashboard verifies the token once and runs its queries concurrently in
+# the threadpool (pymongo is blocking), returning everything the page needs
+# in one response.
+
+def fetch_artist_profile(user_id: str) -> Optional[dict]:
+    """Query the artist record created on approval, if any"""
+    artist = artists_collection.find_one({"user_id": ObjectId(user_id)})
+    if artist:
+        artist["_id"] = str(artist["_id"])
+        artist["user_id"] = str(artist["user_id"])
+    return artist
+
+@router.get("/admin", response_model=dict)
+async def get_admin_dashboard(
+    include_archived: bool = False,
+    token_data: TokenData = Depends(require_admin)
+):
+    """Get profile, statistics and applications for the admin dashboard"""
+    user, stats, applications = await asyncio.gather(
+        asyncio.to_thread(fetch_user_profile, token_data.user_id),
+        asyncio.to_thread(fetch_admin_stats, include_archived),
+        asyncio.to_thread(fetch_all_applications, include_archived)
+    )
+
+    return {
+        "user": user,
+        "stats": stats,
+        "applications": applications
+    }
+
+@router.get("/artist", response_model=dict)
+async def get_artist_dashboard(
+    include_archived: bool = False,
+    token_data: TokenData = Depends(require_artist)
+):
+    """Get profile, artist record and applications for the artist dashboard"""
+    user, artist, applications = await asyncio.gather(
+        asyncio.to_thread(fetch_user_profile, token_data.user_id),
+        asyncio.to_thread(fetch_artist_profile, token_data.user_id),
+        asyncio.to_thread(fetch_user_applications, token_data.user_id, include_archived)
+    )
+
+    return {
+        "user": user,
+        "artist": artist,
+        "applications": applications
+    }
+
+@router.get("/user", response_model=dict)
+async def get_user_dashboard(
+    include_archived: bool = False,
+    token_data: TokenData = Depends(require_user)
+):
+    """Get profile and applications for the user dashboard"""
+    user, applications = await asyncio.gather(
+        asyncio.to_thread(fetch_user_profile, token_data.user_id),
+        asyncio.to_thread(fetch_user_applications, token_data.user_id, include_archived)
+    )
+
+    return {
+        "user": user,
+        "applications": applications
+    }
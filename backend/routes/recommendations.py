@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List
+
+from auth import verify_token, TokenData
+from recommendations import similarity_index
+
+router = APIRouter(prefix="/recommendations", tags=["recommendations"])
+
+@router.get("/artists/{artist_id}/similar", response_model=List[dict])
+async def get_similar_artists(
+    artist_id: str,
+    k: int = Query(10, ge=1, le=100),
+    token_data: TokenData = Depends(verify_token)
+):
+    """Get the artists most similar to an artist by genre (served from memory)"""
+    similar_artists = similarity_index.similar(artist_id, k)
+    
+    if similar_artists is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Artist not found"
+        )
+    
+    return similar_artists
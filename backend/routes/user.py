@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from auth import verify_token, TokenData
-from db import users_collection
+from db import users_collection, artist_applications_collection, artist_applications_archive_collection
 
 router = APIRouter(prefix="/user", tags=["user"])
 
-@router.get("/profile", response_model=dict)
-async def get_user_profile(token_data: TokenData = Depends(verify_token)):
-    """Get current user's profile"""
-    user = users_collection.find_one({"_id": ObjectId(token_data.user_id)})
+def fetch_user_profile(user_id: str) -> dict:
+    """Query a user's profile without sensitive fields"""
+    user = users_collection.find_one({"_id": ObjectId(user_id)})
     
     if not user:
         raise HTTPException(
@@ -23,6 +23,11 @@ async def get_user_profile(token_data: TokenData = Depends(verify_token)):
     
     return user
 
+@router.get("/profile", response_model=dict)
+async def get_user_profile(token_data: TokenData = Depends(verify_token)):
+    """Get current user's profile"""
+    return fetch_user_profile(token_data.user_id)
+
 @router.put("/profile", response_model=dict)
 async def update_user_profile(
     profile_data: dict,
@@ -41,10 +46,16 @@ async def update_user_profile(
         )
     
     # Update user profile
-    result = users_collection.update_one(
-        {"_id": ObjectId(token_data.user_id)},
-        {"$set": profile_data}
-    )
+    try:
+        result = users_collection.update_one(
+            {"_id": ObjectId(token_data.user_id)},
+            {"$set": profile_data}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
     if result.matched_count == 0:
         raise HTTPException(
@@ -52,4 +63,12 @@ async def update_user_profile(
             detail="User not found"
         )
     
+    # Keep the email denormalized onto applications in sync
+    if "email" in profile_data:
+        for collection in (artist_applications_collection, artist_applications_archive_collection):
+            collection.update_many(
+                {"user_id": ObjectId(token_data.user_id)},
+                {"$set": {"email": profile_data["email"]}}
+            )
+    
     return {"message": "Profile updated successfully"}
\ No newline at end of file
@@ -81,6 +81,7 @@ def seed_database():
         {
             "_id": ObjectId("66a02b111111111111111111"),
             "user_id": ObjectId("66a01a333333333333333333"),
+            "email": "user1@mail.com",
             "stage_name": "DJ Nova",
             "genres": ["Electronic", "House"],
             "bio": "Upcoming DJ specializing in deep house music with 3 years of experience performing at local clubs and events.",
@@ -93,6 +94,7 @@ def seed_database():
         {
             "_id": ObjectId("66a02b222222222222222222"),
             "user_id": ObjectId("66a01a444444444444444444"),
+            "email": "user2@mail.com",
             "stage_name": "Luna Rivers",
             "genres": ["Folk", "Acoustic"],
             "bio": "Singer-songwriter with a passion for storytelling through music. I've been performing for 5 years and have released 2 independent albums.",
@@ -0,0 +1,137 @@
+"""
+Concurrency stress test for application reviews.
+
+Seeds pending applications into a scratch database, then fires hundreds of
+parallel approve/reject calls at the same application IDs and checks that
+exactly one review won per application, with its side effects applied once.
+
+Usage:
+    python stress_review.py --applications 20 --attempts 400 --workers 64
+
+Runs against DATABASE_NAME, which defaults to `musical_events_stress` here;
+the database is wiped first, so never point it at real data.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_NAME", "musical_events_stress")
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from db import (
+    artist_applications_collection,
+    artists_collection,
+    audit_log_collection,
+    ensure_indexes,
+    users_collection,
+)
+from models import TokenData
+from routes.admin import approve_application, reject_application
+
+def seed(application_count: int) -> list:
+    """Create one user with one pending application each; returns the application IDs"""
+    print(f"🗑️  Clearing stress database {os.environ['DATABASE_NAME']}...")
+    for collection in (users_collection, artist_applications_collection, artists_collection, audit_log_collection):
+        collection.delete_many({})
+    ensure_indexes()
+
+    application_ids = []
+    for i in range(application_count):
+        user_id = users_collection.insert_one({
+            "email": f"stress{i}@mail.com",
+            "password_hash": "x",
+            "role": 2,
+            "created_at": datetime.utcnow()
+        }).inserted_id
+        application_ids.append(artist_applications_collection.insert_one({
+            "user_id": user_id,
+            "stage_name": f"Stress Act {i}",
+            "genres": ["Rock"],
+            "bio": "Stress test application",
+            "portfolio_links": [],
+            "status": "pending",
+            "reviewed_by": None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }).inserted_id)
+    print(f"✅ Seeded {application_count} pending applications")
+    return application_ids
+
+def attempt_review(application_id: ObjectId, admin: TokenData):
+    """Run one approve or reject through the route function; returns the winning status or None"""
+    if random.random() < 0.5:
+        review, outcome = approve_application, "approved"
+    else:
+        review, outcome = reject_application, "rejected"
+    try:
+        asyncio.run(review(str(application_id), token_data=admin))
+        return application_id, outcome
+    except HTTPException as e:
+        if e.status_code != 400:
+            raise
+        return application_id, None
+
+def verify(application_ids: list, wins: dict) -> list:
+    """Check every application ended in exactly one consistent review"""
+    failures = []
+    for application_id in application_ids:
+        application = artist_applications_collection.find_one({"_id": application_id})
+        user = users_collection.find_one({"_id": application["user_id"]})
+        application_wins = wins.get(application_id, [])
+        artist_count = artists_collection.count_documents({"user_id": application["user_id"]})
+        audit_count = audit_log_collection.count_documents({"target_id": application_id})
+        expected_artists = 1 if application["status"] == "approved" else 0
+        expected_role = 1 if application["status"] == "approved" else 2
+
+        if len(application_wins) != 1:
+            failures.append(f"{application_id}: {len(application_wins)} winning reviews")
+        elif application_wins[0] != application["status"]:
+            failures.append(f"{application_id}: winner {application_wins[0]} but status {application['status']}")
+        if artist_count != expected_artists:
+            failures.append(f"{application_id}: {artist_count} artist records")
+        if user["role"] != expected_role:
+            failures.append(f"{application_id}: user role {user['role']}")
+        if audit_count != 1:
+            failures.append(f"{application_id}: {audit_count} audit events")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent application reviews")
+    parser.add_argument("--applications", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=400, help="parallel reviews per application")
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+
+    application_ids = seed(args.applications)
+    admins = [TokenData(user_id=str(ObjectId()), role=0) for _ in range(8)]
+    jobs = [
+        (application_id, random.choice(admins))
+        for application_id in application_ids
+        for _ in range(args.attempts)
+    ]
+    random.shuffle(jobs)
+
+    print(f"🔨 Firing {len(jobs)} concurrent reviews with {args.workers} workers...")
+    wins = {}
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for application_id, outcome in executor.map(lambda job: attempt_review(*job), jobs):
+            if outcome:
+                wins.setdefault(application_id, []).append(outcome)
+
+    failures = verify(application_ids, wins)
+    if failures:
+        print(f"❌ {len(failures)} consistency failures:")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("🎉 Every application was reviewed exactly once")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from duplicates import estimated_similarity, minhash_signature, normalize_portfolio_link, stage_name_trigrams
+
+def test_different_youtube_videos_do_not_share_a_key():
+    first = normalize_portfolio_link("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    second = normalize_portfolio_link("https://youtube.com/watch?v=9bZkp7q19f0")
+    assert first != second
+
+def test_different_facebook_profiles_do_not_share_a_key():
+    first = normalize_portfolio_link("https://www.facebook.com/profile.php?id=100001")
+    second = normalize_portfolio_link("https://facebook.com/profile.php?id=100002")
+    assert first != second
+
+def test_variants_of_the_same_link_share_a_key():
+    key = normalize_portfolio_link("youtube.com/watch?v=dQw4w9WgXcQ")
+    assert normalize_portfolio_link("https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share&si=abc") == key
+    assert normalize_portfolio_link("HTTPS://WWW.YouTube.com/watch/?utm_source=x&v=dQw4w9WgXcQ") == key
+    assert normalize_portfolio_link("https://soundcloud.com/some-artist/?utm_campaign=x") == "soundcloud.com/some-artist"
+
+def test_blank_links_have_no_key():
+    assert normalize_portfolio_link("   ") is None
+
+def test_similar_stage_names_score_higher_than_unrelated_ones():
+    signature = minhash_signature(stage_name_trigrams("DJ Nova"))
+    assert estimated_similarity(signature, minhash_signature(stage_name_trigrams("D.J. Nová"))) == 1.0
+    assert estimated_similarity(signature, minhash_signature(stage_name_trigrams("The Lumineers"))) < 0.3
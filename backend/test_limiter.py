@@ -0,0 +1,40 @@
+import asyncio
+
+from limiter import RouteClassLimiter
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        limiter = RouteClassLimiter("test", 1)
+        assert await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        limiter.release()
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+        assert not limiter._semaphore.locked()
+
+        # The slot is still usable
+        assert await limiter.acquire()
+        limiter.release()
+
+    asyncio.run(scenario())
+
+def test_waiter_is_shed_after_queue_timeout(monkeypatch):
+    monkeypatch.setattr("limiter.CONCURRENCY_QUEUE_TIMEOUT_SECONDS", 0.01)
+
+    async def scenario():
+        limiter = RouteClassLimiter("test", 1)
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.rejected == 1
+        assert limiter.waiting == 0
+        limiter.release()
+        assert not limiter._semaphore.locked()
+
+    asyncio.run(scenario())
@@ -2,6 +2,7 @@ import React from 'react';
 import { Link, useNavigate } from 'react-router-dom';
 import { Music, User, LogOut } from 'lucide-react';
 import { isAuthenticated, removeToken, getUserRole } from '../utils/auth';
+import { authAPI } from '../utils/api';
 
 interface LayoutProps {
   children: React.ReactNode;
@@ -12,7 +13,13 @@ const Layout: React.FC<LayoutProps> = ({ children }) => {
   const authenticated = isAuthenticated();
   const userRole = getUserRole();
 
-  const handleLogout = () => {
+  const handleLogout = async () => {
+    try {
+      // Revoke the token server-side; logging out locally must not depend on it
+      await authAPI.logout();
+    } catch (err) {
+      // Token may already be expired or revoked
+    }
     removeToken();
     navigate('/');
   };
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Users, CheckCircle, XCircle, Clock, Music, Mail, RefreshCw } from 'lucide-react';
-import { adminAPI } from '../../utils/api';
+import { adminAPI, dashboardAPI } from '../../utils/api';
 
 interface Application {
   _id: string;
@@ -11,6 +11,7 @@ interface Application {
   bio: string;
   portfolio_links: string[];
   status: 'pending' | 'approved' | 'rejected';
+  possible_duplicates: string[];
   created_at: string;
   updated_at: string;
 }
@@ -41,13 +42,10 @@ const AdminDashboard: React.FC = () => {
       setLoading(true);
       setError('');
       
-      const [applicationsData, statsData] = await Promise.all([
-        adminAPI.getApplications(),
-        adminAPI.getStats()
-      ]);
+      const dashboardData = await dashboardAPI.getAdmin();
       
-      setApplications(applicationsData);
-      setStats(statsData);
+      setApplications(dashboardData.applications);
+      setStats(dashboardData.stats);
     } catch (err: any) {
       const errorMessage = err.response?.data?.detail || 'Failed to fetch data';
       setError(errorMessage);
@@ -246,6 +244,11 @@ const AdminDashboard: React.FC = () => {
                               <Mail className="w-3 h-3 mr-1" />
                               {application.email}
                             </div>
+                            {application.possible_duplicates?.length > 0 && (
+                              <div className="text-xs font-medium text-orange-600">
+                                {application.possible_duplicates.length} possible duplicate{application.possible_duplicates.length > 1 ? 's' : ''}
+                              </div>
+                            )}
                           </div>
                         </div>
                       </td>
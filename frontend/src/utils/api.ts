@@ -15,6 +15,11 @@ export const authAPI = {
   getMe: async () => {
     const response = await axiosInstance.get('/auth/me');
     return response.data;
+  },
+
+  logout: async () => {
+    const response = await axiosInstance.post('/auth/logout');
+    return response.data;
   }
 };
 
@@ -56,6 +61,21 @@ export const adminAPI = {
   getStats: async () => {
     const response = await axiosInstance.get('/admin/stats');
     return response.data;
+  },
+  
+  getTrends: async (params: {
+    metric?: 'registrations' | 'applications.submitted' | 'applications.approved' | 'applications.rejected';
+    granularity?: 'hour' | 'day' | 'week';
+    start?: string;
+    end?: string;
+  } = {}) => {
+    const response = await axiosInstance.get('/admin/trends', { params });
+    return response.data;
+  },
+  
+  revokeUserTokens: async (userId: string) => {
+    const response = await axiosInstance.post(`/admin/users/${userId}/revoke-tokens`);
+    return response.data;
   }
 };
 
@@ -70,4 +90,22 @@ export const userAPI = {
     const response = await axiosInstance.put('/user/profile', profileData);
     return response.data;
   }
+};
+
+// Dashboard API (one request per page load)
+export const dashboardAPI = {
+  getAdmin: async () => {
+    const response = await axiosInstance.get('/dashboard/admin');
+    return response.data;
+  },
+
+  getArtist: async () => {
+    const response = await axiosInstance.get('/dashboard/artist');
+    return response.data;
+  },
+
+  getUser: async () => {
+    const response = await axiosInstance.get('/dashboard/user');
+    return response.data;
+  }
 };
\ No newline at end of file